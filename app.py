@@ -9,24 +9,40 @@ Market Dashboard (Streamlit)
 Secrets（Streamlit Cloud）:
 TIINGO_API_KEY = "YOUR_KEY"
 """
+import io
+import base64
 import os
+import time
+import random
+import shutil
+import hashlib
 import logging
+import tempfile
 import warnings
-from datetime import datetime, timezone
-from typing import Optional, Dict, Any, Tuple
-
-import pytz
+import functools
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Tuple, Sequence, NamedTuple
+
+import numpy as np
 import pandas as pd
 import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
+from curl_cffi.requests.exceptions import RequestException as CurlRequestException
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import matplotlib
 matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import matplotlib.font_manager as fm
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 #Google解析
 import os
 import streamlit as st
@@ -87,7 +103,8 @@ def yahoo_chart_url(symbol: str, market: str = "US") -> str:
 # ----------------------------
 # 基本設定
 # ----------------------------
-JST = pytz.timezone("Asia/Tokyo")
+# 日本は夏時間が無いので固定オフセットで足りる（tz データベースを引かない）
+JST = timezone(timedelta(hours=9), "JST")
 
 # ログ抑止
 logging.getLogger("yfinance").setLevel(logging.CRITICAL)
@@ -97,7 +114,9 @@ warnings.filterwarnings("ignore", category=UserWarning)
 
 # ----------------------------
 # 日本語フォント（リポジトリ内 fonts/ 優先）
+#  - 再実行のたびにフォント登録しない（rcParams はプロセス内で保持されるので1回でよい）
 # ----------------------------
+@st.cache_resource(show_spinner=False)
 def setup_japanese_font() -> str:
     candidates = [
         os.path.join("fonts", "NotoSansCJKjp-Regular.otf"),
@@ -117,6 +136,23 @@ def setup_japanese_font() -> str:
 
 FONT_NAME = setup_japanese_font()
 
+# 線の頂点を Agg 側で間引かせる（サブピクセルの折れ線は見た目が変わらない）
+matplotlib.rcParams["path.simplify"] = True
+matplotlib.rcParams["path.simplify_threshold"] = 1.0
+
+# スパークラインの見た目は rcParams で既定にする（ax.clear() が毎回ここから組み直すので軸ごとの設定呼び出しが要らない）
+matplotlib.rcParams.update({
+    "xtick.labelsize": 10,
+    "ytick.labelsize": 10,
+    "axes.xmargin": 0.01,
+    "axes.edgecolor": (0, 0, 0, 0.2),   # 枠線を薄く（spine.set_alpha(0.2) 相当）
+    "axes.facecolor": "none",           # 背景はカードの色を透かす
+    "axes.grid": True,
+    "axes.grid.axis": "y",
+    "grid.alpha": 0.15,
+    "svg.fonttype": "none",             # 目盛りの数字は <text> のまま（グリフをパスにしない）
+})
+
 # ----------------------------
 # 世界株価風カラー
 # ----------------------------
@@ -214,11 +250,187 @@ MARKETS = {
     ],
 }
 
+class Item(NamedTuple):
+    """1カード分の設定（省略できるキーの既定値はここで埋める → 描画側で dict.get しない）"""
+    name: str
+    symbol: str
+    flag: str
+    provider: str = "yahoo"
+    rt_symbol: Optional[str] = None
+
+# 読み込み時に1回だけ組んでおく（描画のたびに MARKETS を辿り直さない）
+#  - SECTIONS: (見出し, そのセクションの Item 列) の列（表示順）
+#  - ALL_ITEMS: 全カード（表示順）
+#  - DAILY_SYMBOLS: 日足を一括取得するシンボル列（rt_symbol を含む・重複なし）
+SECTIONS: Tuple[Tuple[str, Tuple[Item, ...]], ...] = tuple(
+    (title, tuple(Item(**it) for it in items)) for title, items in MARKETS.items()
+)
+ALL_ITEMS = tuple(it for _, items in SECTIONS for it in items)
+DAILY_SYMBOLS = tuple(dict.fromkeys(
+    s for it in ALL_ITEMS for s in (it.symbol, it.rt_symbol) if s
+))
+
 # ----------------------------
 # キャッシュ設定（Cloud向けに長め）
 # ----------------------------
 TTL_DAILY = 180
-TTL_INTRADAY = 180
+
+# ----------------------------
+# ディスクキャッシュ（再起動しても TTL 内なら Yahoo/Tiingo を叩かない）
+#  - st.cache_data(persist="disk") は TTL を無視する（相場が古いまま残る）ため、
+#    ファイルの mtime で TTL を判定する層を st.cache_data の下に敷く
+#  - 空の結果（取得失敗）は書かない。失敗したときは古くても前回取れた結果を返す
+#  - TTL 切れから STALE_GRACE 秒までは古い結果をすぐ返し、裏で取り直す（stale-while-revalidate）
+#  - MARKET_REPLAY_ONLY=1 なら保存済みの結果だけを返し、Yahoo/Tiingo には一切行かない（開発・動作確認用）
+# ----------------------------
+DISK_CACHE_DIR = os.getenv("MARKET_CACHE_DIR", os.path.join(".cache", "market-dashboard"))
+REPLAY_ONLY = os.getenv("MARKET_REPLAY_ONLY", "") not in ("", "0")
+STALE_GRACE = 180
+
+def _write_disk_cache(path: str, value: Any) -> None:
+    tmp = None
+    try:
+        os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=DISK_CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        pd.to_pickle(value, tmp)
+        os.replace(tmp, path)
+    except Exception:
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+
+@st.cache_resource(show_spinner=False)
+def _revalidating() -> Dict[str, Any]:
+    """裏で取り直し中のキャッシュファイル（同じファイルを二重に取りに行かない）"""
+    return {"lock": threading.Lock(), "paths": set()}
+
+def _revalidate(path: str, func, args, kwargs) -> None:
+    state = _revalidating()
+    with state["lock"]:
+        if path in state["paths"]:
+            return
+        state["paths"].add(path)
+
+    def run():
+        try:
+            value = func(*args, **kwargs)
+            if value is not None and len(value) > 0:
+                _write_disk_cache(path, value)
+        finally:
+            with state["lock"]:
+                state["paths"].discard(path)
+
+    t = threading.Thread(target=run, daemon=True)
+    add_script_run_ctx(t, get_script_run_ctx())
+    t.start()
+
+def disk_cache(ttl: int, empty=pd.DataFrame):
+    """empty: リプレイ専用モードで保存が無いときに返す「取得失敗」の値を作る"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = repr((func.__name__, args, sorted(kwargs.items())))
+            path = os.path.join(DISK_CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+            if REPLAY_ONLY:
+                # 古さは問わない。無ければ取得失敗と同じ扱い
+                try:
+                    return pd.read_pickle(path)
+                except Exception:
+                    return empty()
+            try:
+                age = time.time() - os.path.getmtime(path)
+                if age < ttl:
+                    return pd.read_pickle(path)
+                if age < ttl + STALE_GRACE:
+                    value = pd.read_pickle(path)
+                    _revalidate(path, func, args, kwargs)
+                    return value
+            except Exception:
+                pass
+
+            value = func(*args, **kwargs)
+            if value is not None and len(value) > 0:
+                _write_disk_cache(path, value)
+                return value
+            # 取得失敗（429 など）→ 古くても前回取れた結果があればそれを出す
+            try:
+                return pd.read_pickle(path)
+            except Exception:
+                return value
+        return wrapper
+    return decorator
+
+def clear_disk_cache() -> None:
+    # リプレイ専用モードではディスク上の記録がデータのすべてなので消さない
+    if REPLAY_ONLY:
+        return
+    shutil.rmtree(DISK_CACHE_DIR, ignore_errors=True)
+
+# ----------------------------
+# 並列取得（I/O待ちを重ねる。一括取得が落ちたときの銘柄単位フォールバックで Yahoo の429に触れないよう上限8）
+# ----------------------------
+MAX_WORKERS = 8
+
+def thread_pool(max_workers: int) -> ThreadPoolExecutor:
+    # ワーカーには ScriptRunContext を引き継ぐ（st.cache_data / st.cache_resource / st.secrets 用）
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx()),
+    )
+
+# ----------------------------
+# 取得結果の整形（全 fetch 共通）
+# ----------------------------
+# 下流で読むのは Open/Close だけ。列を絞るとキャッシュの pickle も軽くなる
+FRAME_COLUMNS = ["Open", "Close"]
+
+# 取得結果は UTC のまま持つ。JST にするのは表示する時刻（カードの日付・チャートの目盛り）だけ
+def to_utc(df: pd.DataFrame) -> pd.DataFrame:
+    # 取得直後の自前の DataFrame なので index だけ差し替える（df.tz_convert だと DataFrame ごと作り直す）
+    tz = df.index.tz
+    if tz is None:
+        df.index = df.index.tz_localize("UTC")
+        return df
+    # Tiingo（to_datetime(utc=True)）は最初から UTC。変換しても同じなのでそのまま返す
+    if str(tz) == "UTC":
+        return df
+    df.index = df.index.tz_convert("UTC")
+    return df
+
+def slim_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Open/Close に絞り、Close 欠損行を落とす（欠損が無ければ行の抽出はしない）"""
+    if "Close" not in df.columns:
+        return pd.DataFrame()
+    df = df[[c for c in FRAME_COLUMNS if c in df.columns]]
+    valid = df["Close"].notna()
+    return df if valid.all() else df[valid]
+
+# ----------------------------
+# HTTP セッション（Tiingo 用。keep-alive で TLS ハンドシェイクを使い回す）
+#  - yfinance は内部で共有の curl_cffi セッションを持つので渡さない
+#    （requests.Session に差し替えると Yahoo 側にブロックされやすい）
+#  - 429/5xx は少し待って2回まで再送（Retry-After があればそれに従うが、待つのは最長5秒）
+#    （urllib3 の既定は最長6時間。ワーカーが寝たままだとカード一覧全体が待たされる）
+#  - 接続は3秒・応答は10秒で打ち切る（つながらない相手を10秒待たない）
+#  - gzip は requests が既定で Accept-Encoding に付けている
+# ----------------------------
+HTTP_RETRY = Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET",),
+    raise_on_status=False,
+    retry_after_max=5,
+)
+HTTP_TIMEOUT = (3, 10)
+
+# 再実行のたびにモジュールが走り直すので、セッション（接続プール）は cache_resource でプロセスに1つだけ持つ
+@st.cache_resource(show_spinner=False)
+def http_session() -> requests.Session:
+    s = requests.Session()
+    s.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=HTTP_RETRY))
+    return s
 
 # ----------------------------
 # Tiingo
@@ -233,7 +445,8 @@ def get_tiingo_key() -> Optional[str]:
         pass
     return os.getenv("TIINGO_API_KEY")
 
-@st.cache_data(ttl=TTL_DAILY, show_spinner=False)
+@st.cache_data(ttl=TTL_DAILY, show_spinner=False, max_entries=64)
+@disk_cache(ttl=TTL_DAILY)
 def fetch_daily_tiingo(symbol: str, days: int = 20) -> pd.DataFrame:
     key = get_tiingo_key()
     if not key:
@@ -255,112 +468,252 @@ def fetch_daily_tiingo(symbol: str, days: int = 20) -> pd.DataFrame:
                 "endDate": end_utc.date().isoformat(),
                 "token": key,
             }
-            r = requests.get(url, params=params, timeout=10)
+            r = http_session().get(url, params=params, timeout=HTTP_TIMEOUT)
             if r.status_code != 200:
                 continue
 
             js = r.json()
-            if not js:
+            if not js or not isinstance(js, list) or "date" not in js[0] or "close" not in js[0]:
                 continue
 
-            df = pd.DataFrame(js)
-            if "date" not in df.columns or "close" not in df.columns:
-                continue
-
-            df["date"] = pd.to_datetime(df["date"], utc=True)
-            df = df.set_index("date").sort_index()
-
-            out = pd.DataFrame(index=df.index)
-            out["Open"] = df.get("open")
-            out["High"] = df.get("high")
-            out["Low"] = df.get("low")
-            out["Close"] = df.get("close")
-            out["Volume"] = df.get("volume", 0)
+            # 使うのは date/open/close だけ。全列（adj*・divCash など）を DataFrame にしてから選ばない
+            #  - null は dtype=float64 の配列化で NaN になる（slim_frame で落ちる）
+            out = pd.DataFrame(
+                {
+                    "Open": np.array([row.get("open") for row in js], dtype=np.float64),
+                    "Close": np.array([row.get("close") for row in js], dtype=np.float64),
+                },
+                index=pd.to_datetime([row["date"] for row in js], utc=True),
+            )
+            if not out.index.is_monotonic_increasing:
+                out = out.sort_index()
 
-            out = out.tz_convert(JST).dropna(subset=["Close"])
-            return out
+            return slim_frame(to_utc(out))
 
     except Exception:
         return pd.DataFrame()
 
     return pd.DataFrame()
 
+# ----------------------------
+# Yahoo へのリクエスト数制限（トークンバケット・429 が続いたときの遮断）
+#  - 429 を食らってから引くのではなく、出す前にプロセス全体で毎分の件数を抑える
+#  - yf.download は銘柄ごとに1リクエストなので、銘柄数ぶんのトークンを取る
+# ----------------------------
+YAHOO_RPM = 60
+
+class TokenBucket:
+    """毎分 rpm 件まで。トークンが足りなければ貯まるまで待つ（スレッド・セッション間で共有）"""
+
+    def __init__(self, rpm: int):
+        self.rate = rpm / 60.0
+        self.capacity = float(rpm)
+        self.tokens = float(rpm)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n: int = 1) -> None:
+        n = min(float(n), self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+@st.cache_resource(show_spinner=False)
+def yahoo_bucket() -> TokenBucket:
+    """プロセスで1つ。更新ボタンでも作り直さない（st.cache_resource.clear() で全消しすると制限が外れる）"""
+    return TokenBucket(YAHOO_RPM)
+
+# 429（YFRateLimitError）が RATE_LIMIT_STRIKES 回続いたら RATE_LIMIT_COOLDOWN 秒は Yahoo に出さない
+#  - 制限中に残りの銘柄へ投げても全部 429 になるだけ（待ち時間が延び、制限も長引く）
+#  - 遮断中の取得は空を返す → disk_cache が前回取れた値を返す
+RATE_LIMIT_STRIKES = 2
+RATE_LIMIT_COOLDOWN = 300
+
+class CircuitBreaker:
+    """strikes 回続けて失敗したら cooldown 秒だけ遮断。1回でも成功すれば数え直し（スレッド・セッション間で共有）"""
+
+    def __init__(self, strikes: int, cooldown: float):
+        self.strikes = strikes
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    def success(self) -> None:
+        with self.lock:
+            self.failures = 0
+
+    def failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.strikes:
+                self.open_until = time.monotonic() + self.cooldown
+                self.failures = 0
+
+@st.cache_resource(show_spinner=False)
+def yahoo_breaker() -> CircuitBreaker:
+    return CircuitBreaker(RATE_LIMIT_STRIKES, RATE_LIMIT_COOLDOWN)
+
 # ----------------------------
 # Yahoo(yfinance) 日足
 # ----------------------------
-@st.cache_data(ttl=TTL_DAILY, show_spinner=False)
+# yf.Ticker は銘柄ごとに1つだけ作って使い回す（内部のセッション/メタ情報を共有）
+#  - スクリプトは再実行のたびに頭から走り直すので、モジュールの dict ではなく cache_resource に持つ
+@st.cache_resource(max_entries=128, show_spinner=False)
+def get_ticker(symbol: str) -> yf.Ticker:
+    return yf.Ticker(symbol)
+
+# 一時的な失敗（429・通信エラー）は 0.5秒 → 1秒 と待って取り直す（ばらつきを少し足して同時に再送しない）
+#  - 429 が続けば遮断器が開くので、再試行もそこで打ち切る
+#  - yfinance は応答ヘッダを渡さないので Retry-After は見られない
+YAHOO_RETRIES = 2
+YAHOO_BACKOFF = 0.5
+# 取り直して意味があるのは通信まわりの一時的な失敗だけ（yfinance は curl_cffi で通信する）。それ以外はすぐ諦める
+YAHOO_TRANSIENT = (requests.RequestException, CurlRequestException)
+
+def yahoo_history(symbol: str, **kwargs) -> Optional[pd.DataFrame]:
+    """Ticker.history を遮断器・トークンバケット・再試行つきで呼ぶ。遮断中・取り切れない・一時的でない失敗は None"""
+    breaker = yahoo_breaker()
+    for attempt in range(YAHOO_RETRIES + 1):
+        if attempt:
+            time.sleep(YAHOO_BACKOFF * 2 ** (attempt - 1) + random.random() * 0.1)
+        if not breaker.allow():
+            return None
+        try:
+            yahoo_bucket().acquire()
+            df = get_ticker(symbol).history(**kwargs)
+        except YFRateLimitError:
+            breaker.failure()
+            continue
+        except YAHOO_TRANSIENT:
+            continue
+        except Exception:
+            return None
+        breaker.success()
+        return df
+    return None
+
+@st.cache_data(ttl=TTL_DAILY, show_spinner=False, max_entries=128)
+@disk_cache(ttl=TTL_DAILY)
 def fetch_daily_yahoo(symbol: str, days: int = 20) -> pd.DataFrame:
     try:
         end_utc = datetime.now(timezone.utc)
         start_utc = end_utc - pd.Timedelta(days=days)
-        df = yf.Ticker(symbol).history(start=start_utc, end=end_utc, interval="1d", auto_adjust=False)
+        df = yahoo_history(symbol, start=start_utc, end=end_utc, interval="1d", auto_adjust=False)
         if df is None or df.empty:
             return pd.DataFrame()
-        if df.index.tz is None:
-            df.index = df.index.tz_localize("UTC")
-        return df.tz_convert(JST).dropna(subset=["Close"])
+        return slim_frame(to_utc(df))
     except Exception:
         return pd.DataFrame()
 
-def fetch_daily(symbol: str, days: int = 20, provider: str = "yahoo") -> pd.DataFrame:
+# 1回の yf.download に載せる銘柄数（URL長・Yahoo 側の制限に収まるよう20まで）
+YF_BATCH_SIZE = 20
+
+def _download_daily_chunk(symbols: Sequence[str], start_utc: datetime, end_utc: datetime) -> Dict[str, pd.DataFrame]:
+    """
+    1チャンク分の yf.download。取れた銘柄だけを返す（失敗したら {}）
+    - 欠けた・全部 NaN の銘柄は入れない（yf.download は銘柄ごとの 429 を握りつぶして空にする）
+      → その銘柄だけ呼び出し側で銘柄単位の取得（再試行・遮断・前回値あり）に戻る
+    """
+    # yf.download は 429 を銘柄ごとのエラーとして握りつぶすので、ここでは遮断中かどうかだけ見る
+    if not yahoo_breaker().allow():
+        return {}
+    try:
+        yahoo_bucket().acquire(len(symbols))
+        raw = yf.download(
+            list(symbols),
+            start=start_utc,
+            end=end_utc,
+            interval="1d",
+            auto_adjust=False,
+            group_by="ticker",
+            threads=True,
+            progress=False,
+        )
+        if raw is None or raw.empty:
+            return {}
+        raw = to_utc(raw)
+
+        tickers = set(raw.columns.get_level_values(0)) if isinstance(raw.columns, pd.MultiIndex) else set()
+        out = {}
+        for sym in symbols:
+            if sym in tickers:
+                df = slim_frame(raw[sym])
+            elif not tickers and len(symbols) == 1:
+                df = slim_frame(raw)
+            else:
+                continue
+            if not df.empty:
+                out[sym] = df
+        return out
+    except Exception:
+        return {}
+
+@st.cache_data(ttl=TTL_DAILY, show_spinner=False, max_entries=8)
+@disk_cache(ttl=TTL_DAILY, empty=dict)
+def fetch_daily_yahoo_batch(symbols: Tuple[str, ...], days: int = 20) -> Dict[str, pd.DataFrame]:
+    """
+    - yf.download で全銘柄の日足を YF_BATCH_SIZE 銘柄ずつまとめて取得
+    - 戻り値は {symbol: 日足}（取れた銘柄だけ）
+    - 取れなかった銘柄・失敗したチャンクの銘柄は戻り値に含めない → 呼び出し側で銘柄単位の取得に戻る
+    """
+    if not symbols:
+        return {}
+    end_utc = datetime.now(timezone.utc)
+    start_utc = end_utc - pd.Timedelta(days=days)
+
+    # チャンク内は threads=True で既に並行。チャンク同士まで重ねると同時接続が増えてレート制限に触れやすい
+    out = {}
+    for i in range(0, len(symbols), YF_BATCH_SIZE):
+        out.update(_download_daily_chunk(symbols[i:i + YF_BATCH_SIZE], start_utc, end_utc))
+    return out
+
+def fetch_daily(
+    symbol: str,
+    days: int = 20,
+    provider: str = "yahoo",
+    daily_map: Optional[Dict[str, pd.DataFrame]] = None,
+) -> pd.DataFrame:
     # provider が tiingo のときだけ Tiingo を先に試す（失敗したら Yahoo）
     if provider == "tiingo":
         df_t = fetch_daily_tiingo(symbol, days=days)
-        if not df_t.empty and df_t["Close"].dropna().shape[0] >= 2:
+        if len(df_t) >= 2:
             return df_t
+    # 一括取得に含まれていればそれを使う（含まれない＝一括取得で取れなかった銘柄だけ銘柄単位）
+    if daily_map is not None and symbol in daily_map:
+        return daily_map[symbol]
     return fetch_daily_yahoo(symbol, days=days)
 
-# ----------------------------
-# Yahoo(yfinance) イントラ（1m→2m→5m→15m）
-# ----------------------------
-@st.cache_data(ttl=TTL_INTRADAY, show_spinner=False)
-def fetch_intraday(symbol: str) -> pd.DataFrame:
-    for interval in ("1m", "2m", "5m", "15m"):
-        try:
-            df = yf.Ticker(symbol).history(period="1d", interval=interval, auto_adjust=False)
-            if df is None or df.empty:
-                continue
-            if df.index.tz is None:
-                df.index = df.index.tz_localize("UTC")
-            df = df.tz_convert(JST).dropna(subset=["Close"])
-            if df.empty:
-                continue
-            df.attrs["interval"] = interval
-            return df
-        except Exception:
-            continue
-    return pd.DataFrame()
-
-# ----------------------------
-# 安全な値取り
-# ----------------------------
-def safe_last_price(df: pd.DataFrame) -> Optional[float]:
-    try:
-        s = df["Close"].dropna()
-        return float(s.iloc[-1]) if not s.empty else None
-    except Exception:
-        return None
-
-def safe_first_open(df: pd.DataFrame) -> Optional[float]:
-    try:
-        s = df["Open"].dropna()
-        return float(s.iloc[0]) if not s.empty else None
-    except Exception:
-        return None
-
 # ----------------------------
 # カード用計算
 # ----------------------------
-def compute_card(symbol: str, rt_symbol: Optional[str] = None, provider: str = "yahoo") -> Dict[str, Any]:
+CARD_DAILY_DAYS = 15
+
+def compute_card(
+    symbol: str,
+    rt_symbol: Optional[str] = None,
+    provider: str = "yahoo",
+    daily_map: Optional[Dict[str, pd.DataFrame]] = None,
+) -> Dict[str, Any]:
     """
     - intradayが取れれば「当日開始比」
     - 取れない/市場休みなら dailyで「前日比」
     - rt_symbol があれば intraday はそちら（先物）で取得
     - daily は provider に従う（フジクラだけTiingo等）
+    - daily_map は fetch_daily_yahoo_batch の結果（あれば Yahoo 日足はそこから引く）
     """
-    intraday_sym = rt_symbol or symbol
-    intra = fetch_intraday(intraday_sym)
-    daily = fetch_daily(...)
+    # intraday 分岐は現在無効（下のコメントアウト参照）。使われない fetch_intraday / safe_* は置いていない
+    # （戻すときは履歴から取得関数と値取りを一緒に戻す）
 #    if not intra.empty:
 #        now = safe_last_price(intra)
 #        base = safe_first_open(intra)
@@ -385,20 +738,23 @@ def compute_card(symbol: str, rt_symbol: Optional[str] = None, provider: str = "
 
 
     # intraday無い → daily（短期だけでOKなら days=15 くらいで十分）
-    daily = fetch_daily(symbol, days=15, provider=provider)
+    daily = fetch_daily(symbol, days=CARD_DAILY_DAYS, provider=provider, daily_map=daily_map)
 
-    if (daily.empty or daily["Close"].dropna().shape[0] < 2) and rt_symbol:
-        daily = fetch_daily(rt_symbol, days=15, provider=provider)
+    # fetch_* は Close 欠損行を落として返す（slim_frame）ので、ここで dropna し直さない
+    if len(daily) < 2 and rt_symbol:
+        daily = fetch_daily(rt_symbol, days=CARD_DAILY_DAYS, provider=provider, daily_map=daily_map)
 
-    if daily.empty or daily["Close"].dropna().shape[0] < 2:
+    if len(daily) < 2:
         return {"ok": False, "reason": "取得できませんでした"}
 
-    closes = daily["Close"].dropna()
-    now = float(closes.iloc[-1])
-    prev = float(closes.iloc[-2])
+    closes = daily["Close"]
+    # 数値は numpy 配列から直接取る（Series はチャート用に tail だけ渡す）
+    arr = closes.to_numpy(dtype=np.float64, copy=False)
+    now = float(arr[-1])
+    prev = float(arr[-2])
     chg = now - prev
     pct = (now / prev - 1.0) * 100.0
-    last_ts = closes.index[-1]
+    last_ts = closes.index[-1].tz_convert(JST)
 
     return {
         "ok": True,
@@ -414,180 +770,361 @@ def compute_card(symbol: str, rt_symbol: Optional[str] = None, provider: str = "
         "rt_used": bool(rt_symbol),
     }
 
+CardKey = Tuple[str, Optional[str], str]
+
+def card_key(it: Item) -> CardKey:
+    return (it.symbol, it.rt_symbol, it.provider)
+
+def compute_cards(
+    items: Sequence[Item],
+    daily_map: Optional[Dict[str, pd.DataFrame]] = None,
+) -> Dict[CardKey, Dict[str, Any]]:
+    """
+    - 全カードの compute_card をスレッドプールで同時実行（ネットワーク待ちを重ねる）
+    - 同じ (symbol, rt_symbol, provider) は1回だけ計算
+    """
+    keys = list(dict.fromkeys(card_key(it) for it in items))
+    if not keys:
+        return {}
+
+    with thread_pool(min(MAX_WORKERS, len(keys))) as ex:
+        results = ex.map(lambda k: compute_card(*k, daily_map=daily_map), keys)
+        return dict(zip(keys, results))
+
 # ----------------------------
 # 短期チャート（当日: 時間 / CLOSE: 日付）
 # ----------------------------
-def make_sparkline(series: pd.Series, base: float, mode: str, up: bool):
-    fig, ax = plt.subplots(figsize=(5.6, 1.75))
+# 図幅（約560px）に対して 1 区間 5px 弱あれば折れ線の形は変わらないので、それ以上は間引く
+SPARK_MAX_POINTS = 120
+# x 軸の目盛り数（始点と終点＝最新を含む）
+SPARK_TICKS = 4
+
+def decimate(series: pd.Series, target: int = SPARK_MAX_POINTS) -> pd.Series:
+    """等間隔に target 点を選ぶ（始点と終点＝最新値は必ず残す）"""
+    if series is None or len(series) <= target:
+        return series
+    return series.iloc[np.linspace(0, len(series) - 1, target).round().astype(int)]
+
+def draw_sparkline(ax, series: pd.Series, base: float, mode: str, up: bool) -> None:
+    ax.clear()
+    series = decimate(series)
 
     if series is None or series.empty:
-        ax.text(0.5, 0.5, "N/A", ha="center", va="center")
-        ax.axis("off")
-        return fig
+        ax.set_axis_off()
+        ax.text(0.5, 0.5, "N/A", ha="center", va="center", transform=ax.transAxes)
+        return
+    ax.set_axis_on()
 
-    x = series.index
-    y = series.values
+    # plot と fill_between がそれぞれ DatetimeIndex を日付数値へ変換し直さないよう、先に1回だけ変換しておく
+    x = mdates.date2num(series.index.tz_convert("UTC").tz_localize(None).to_numpy())
+    y = series.to_numpy(dtype=np.float64)
 
     ax.axhline(base, linewidth=1, alpha=0.6, color="black")
-    ax.plot(x, y, linewidth=1.8, color=LINE_NEUTRAL, alpha=0.95)
+    ax.plot(x, y, linewidth=1.5, color=LINE_NEUTRAL, alpha=0.95)
 
+    # 基準線をまたぐたびに多角形を切り分ける where= は使わず、騰落の色で1枚だけ塗る
     fill_color = GREEN if up else RED
-    ax.fill_between(x, y, base, where=(y >= base), alpha=0.12, color=GREEN)
-    ax.fill_between(x, y, base, where=(y < base), alpha=0.12, color=RED)
+    ax.fill_between(x, y, base, alpha=0.12, color=fill_color)
 
-    if mode == "INTRADAY":
-        ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M", tz=JST))
-        ax.xaxis.set_major_locator(mdates.AutoDateLocator(minticks=3, maxticks=6))
-    else:
-        ax.xaxis.set_major_formatter(mdates.DateFormatter("%m/%d", tz=JST))
-        ax.xaxis.set_major_locator(mdates.AutoDateLocator(minticks=3, maxticks=6))
+    # 目盛りは AutoDateLocator に探させず、系列上の等間隔 SPARK_TICKS 点に固定する
+    # （ラベルはその数点だけまとめて文字列化し、描画時の日付変換・tz 付き strftime を省く）
+    ticks = np.unique(np.linspace(0, len(x) - 1, SPARK_TICKS).round().astype(int))
+    fmt = "%H:%M" if mode == "INTRADAY" else "%m/%d"
+    ax.set_xticks(x[ticks], series.index[ticks].tz_convert(JST).strftime(fmt))
+
+def new_spark_figure() -> Tuple[Figure, Any]:
+    """
+    - pyplot を通さない（pyplot 管理下の図は解放されず溜まる）
+    - tight_layout は描画のたびにレイアウトを解くので固定余白にする（図サイズは固定）
+    """
+    # layout="none": matplotlibrc の figure.autolayout / constrained_layout に左右されず、
+    # 描画時にレイアウトエンジンを走らせない
+    fig = Figure(figsize=(5.6, 1.75), layout="none")
+    # 背景は塗らない（カードの背景色がそのまま透ける）
+    fig.patch.set_facecolor("none")
+    fig.subplots_adjust(left=0.125, right=0.99, bottom=0.16, top=0.96)
+    return fig, fig.subplots()
+
+# 1セッションは1枚ずつ順に描くので、同時に描画しうるセッション数ぶんあればよい
+SPARK_FIGURE_POOL = 4
+
+@st.cache_resource(show_spinner=False)
+def spark_figure_pool() -> "queue.Queue[Tuple[Figure, Any]]":
+    """
+    - Figure/Axes は SPARK_FIGURE_POOL 組だけ確保してプロセス内で貸し回す（カード数ぶん持たない）
+    - 借りたセッションが描き終えて返すまで他は待つ
+    """
+    pool = queue.Queue()
+    for _ in range(SPARK_FIGURE_POOL):
+        pool.put(new_spark_figure())
+    return pool
+
+@st.cache_resource(max_entries=128, show_spinner=False)
+def sparkline_slot(symbol: str) -> Dict[str, Any]:
+    """カード（symbol）ごとの描画結果（前回のキーと data URI）。再実行・セッションをまたいで使い回す"""
+    return {"key": None, "src": "", "lock": threading.Lock()}
+
+# SVG のメタデータ（作成日時など）は書かない。描画のたびに変わるうえ表示には不要
+SVG_METADATA = {"Date": None, "Creator": None, "Format": None, "Type": None}
+
+def sparkline_src(symbol: str, series: pd.Series, base: float, mode: str, up: bool) -> str:
+    """
+    - データが変わったときだけ ax.clear() して描き直し、SVG → data URI にする
+    - 変わっていなければ前回の data URI をそのまま返す（描き直しも base64 化も省く）
+    - PNG（Agg のラスタライズ + zlib）より速く、サイズも約半分。拡大してもぼやけない
+    """
+    slot = sparkline_slot(symbol)
+    # 末尾の1点だけでは途中の値の修正（配当調整・確定値の差し替え）を見落とすので、系列全体のバイト列で比べる
+    key = (
+        hash(series.index.asi8.tobytes() + series.to_numpy(dtype=float).tobytes())
+        if series is not None and not series.empty
+        else None,
+        base,
+        mode,
+        up,
+    )
+    # 他セッション・他スレッドと共有しているので、描き直し〜SVG化まで排他
+    with slot["lock"]:
+        if slot["key"] != key:
+            pool = spark_figure_pool()
+            fig, ax = pool.get()
+            try:
+                draw_sparkline(ax, series, base, mode, up)
+                buf = io.BytesIO()
+                fig.savefig(buf, format="svg", metadata=SVG_METADATA)
+            finally:
+                pool.put((fig, ax))
+            slot["src"] = "data:image/svg+xml;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+            slot["key"] = key
+        return slot["src"]
+
+# 軽量モードの SVG（viewBox の座標系。img の幅に合わせて縦横比を保って伸縮する）
+SVG_W, SVG_H, SVG_PAD = 560, 120, 6
+
+def sparkline_svg(series: pd.Series, base: float, up: bool) -> str:
+    """
+    - matplotlib を通さず折れ線（polyline）と基準線だけの SVG を組む（軸・目盛りなし）
+    - 座標は numpy でまとめて計算し、data URI にして通常のチャートと同じく <img> で出す
+    """
+    y = decimate(series).to_numpy(dtype=float)
+    lo = min(y.min(), base)
+    hi = max(y.max(), base)
+    span = (hi - lo) or 1.0
+    to_px = lambda v: SVG_H - SVG_PAD - (v - lo) / span * (SVG_H - 2 * SVG_PAD)
+
+    xs = np.linspace(0, SVG_W, len(y)) if len(y) > 1 else np.array([SVG_W / 2])
+    points = " ".join(f"{x:.1f},{v:.1f}" for x, v in zip(xs, to_px(y)))
+    base_y = to_px(base)
+    color = GREEN if up else RED
+
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SVG_W}" height="{SVG_H}" viewBox="0 0 {SVG_W} {SVG_H}">'
+        f'<line x1="0" y1="{base_y:.1f}" x2="{SVG_W}" y2="{base_y:.1f}" stroke="black" stroke-opacity="0.6" stroke-dasharray="4 3"/>'
+        f'<polyline fill="none" stroke="{color}" stroke-width="2.5" stroke-linejoin="round" points="{points}"/>'
+        "</svg>"
+    )
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode("utf-8")).decode("ascii")
 
-    ax.tick_params(axis="x", labelsize=10, rotation=0)
-    ax.tick_params(axis="y", labelsize=10)
-    ax.margins(x=0.01)
+def render_sparklines(
+    items: Sequence[Item],
+    cards: Dict[CardKey, Dict[str, Any]],
+    light: bool = False,
+) -> Dict[str, str]:
+    """
+    - 取得できたカードのチャートを data URI 化（データが変わっていないカードは前回の結果）
+    - SVG 書き出しは Python 側の処理で GIL を離さないので、スレッドに分けても速くならない → 順に描く
+    - light=True なら matplotlib を使わず軸なしの SVG
+    """
+    jobs = {}
+    for it in items:
+        data = cards[card_key(it)]
+        if data.get("ok"):
+            jobs[it.symbol] = (it.symbol, data["series"], data["base"], data["mode"], data["pct"] >= 0)
+    if not jobs:
+        return {}
 
-    for spine in ax.spines.values():
-        spine.set_alpha(0.2)
-    ax.grid(True, axis="y", alpha=0.15)
+    if light:
+        return {sym: sparkline_svg(series, base, up) for sym, (_, series, base, _, up) in jobs.items()}
 
-    plt.tight_layout()
-    return fig
+    return {sym: sparkline_src(*args) for sym, args in jobs.items()}
 
 # ----------------------------
 # カードCSS（フォント大きめ & 1行ヘッダ）
 # ----------------------------
-def card_css(bg: str) -> str:
-    return f"""
-    <style>
-    .wk-card {{
-      border: 1px solid rgba(0,0,0,0.08);
-      border-radius: 10px;
-      padding: 10px 12px;
-      background: {bg};
-      box-shadow: 0 1px 2px rgba(0,0,0,0.04);
-    }}
-    .wk-head {{
-      display:flex;
-      align-items:baseline;
-      justify-content:space-between;
-      gap: 10px;
-      margin-bottom: 6px;
-    }}
-    .wk-name {{
-      font-weight: 900;
-      font-size: 18px;
-      line-height: 1.1;
-      overflow: hidden;
-      text-overflow: ellipsis;
-      white-space: nowrap;
-    }}
-    .wk-sym {{
-      font-weight: 700;
-      font-size: 12px;
-      color: rgba(0,0,0,0.55);
-      margin-left: 8px;
-    }}
-    .wk-pct {{
-      font-weight: 900;
-      font-size: 26px;
-      line-height: 1;
-      white-space: nowrap;
-    }}
-    .wk-now {{
-      font-size: 14px;
-      color: rgba(0,0,0,0.75);
-      margin-bottom: 4px;
-    }}
-    .wk-foot {{
-      font-size: 12px;
-      color: rgba(0,0,0,0.55);
-    }}
-    </style>
-    """
+# 背景色はクラスで切り替える（<style> はページ全体に効くのでカードごとに出すと最後の色で上書きされる）
+CARD_CSS = f"""
+<style>
+.wk-grid {{
+  display: grid;
+  grid-template-columns: repeat(4, minmax(0, 1fr));
+  gap: 1rem;
+  margin-bottom: 1rem;
+}}
+@media (max-width: 640px) {{
+  .wk-grid {{ grid-template-columns: minmax(0, 1fr); }}
+}}
+.wk-card {{
+  border: 1px solid rgba(0,0,0,0.08);
+  border-radius: 10px;
+  padding: 10px 12px;
+  background: {BG_NEUTRAL};
+  box-shadow: 0 1px 2px rgba(0,0,0,0.04);
+}}
+.wk-card.up {{ background: {BG_UP}; }}
+.wk-card.dn {{ background: {BG_DN}; }}
+.wk-head {{
+  display:flex;
+  align-items:baseline;
+  justify-content:space-between;
+  gap: 10px;
+  margin-bottom: 6px;
+}}
+.wk-name {{
+  font-weight: 900;
+  font-size: 18px;
+  line-height: 1.1;
+  overflow: hidden;
+  text-overflow: ellipsis;
+  white-space: nowrap;
+}}
+.wk-sym {{
+  font-weight: 700;
+  font-size: 12px;
+  color: rgba(0,0,0,0.55);
+  margin-left: 8px;
+}}
+.wk-pct {{
+  font-weight: 900;
+  font-size: 26px;
+  line-height: 1;
+  white-space: nowrap;
+}}
+.wk-now {{
+  font-size: 14px;
+  color: rgba(0,0,0,0.75);
+  margin-bottom: 4px;
+}}
+.wk-foot {{
+  font-size: 12px;
+  color: rgba(0,0,0,0.55);
+}}
+.wk-spark {{
+  display: block;
+  width: 100%;
+  margin-top: 6px;
+}}
+</style>
+"""
 
-def render_market_row(items, cols=4):
-    columns = st.columns(cols)
-    for i, it in enumerate(items):
-        col = columns[i % cols]
-        with col:
-            data = compute_card(
-                it["symbol"],
-                it.get("rt_symbol"),
-                it.get("provider", "yahoo"),
-            )
+# HTML ブロックは空行で終わる（Markdown 扱いに戻る）ので、カードHTMLは空行なし・インデントなしで組む
+def _card_name_html(it: Item) -> str:
+    return f'<div class="wk-name">{it.name}<span class="wk-sym">{it.symbol}</span></div>'
+
+def _card_na_html(it: Item) -> str:
+    return (
+        '<div class="wk-card">'
+        '<div class="wk-head">'
+        f'{_card_name_html(it)}'
+        '<div class="wk-pct" style="color:#666;">N/A</div>'
+        '</div>'
+        '<div class="wk-now">取得できませんでした</div>'
+        f'<div class="wk-foot">Provider: {it.provider} / RT: {it.rt_symbol or "-"}</div>'
+        '</div>'
+    )
 
-            if not data.get("ok"):
-                st.markdown(card_css(BG_NEUTRAL), unsafe_allow_html=True)
-                st.markdown(
-                    f"""
-                    <div class="wk-card">
-                      <div class="wk-head">
-                        <div class="wk-name">{it["name"]}<span class="wk-sym">{it["symbol"]}</span></div>
-                        <div class="wk-pct" style="color:#666;">N/A</div>
-                      </div>
-                      <div class="wk-now">取得できませんでした</div>
-                      <div class="wk-foot">Provider: {it.get("provider","yahoo")} / RT: {it.get("rt_symbol","-")}</div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
-                continue
+# 銘柄名の見出しと「取得できませんでした」カードは銘柄ごとに固定なので読み込み時に1回だけ組む
+CARD_NAME_HTML = {it.symbol: _card_name_html(it) for it in ALL_ITEMS}
+CARD_NA_HTML = {it.symbol: _card_na_html(it) for it in ALL_ITEMS}
+
+def card_html(it: Item, data: Dict[str, Any], src: Optional[str]) -> str:
+    if not data.get("ok"):
+        return CARD_NA_HTML[it.symbol]
+
+    pct = data["pct"]
+    chg = data["chg"]
+    now = data["now"]
+    mode = data["mode"]
+    date_label = data["date_label"]
+    # 日足（CLOSE）の Last は date_label と同じ文字列なので書式化し直さない
+    last_ts = f"{data['last_ts']:%m/%d %H:%M} JST" if mode == "INTRADAY" else date_label
+
+    up = pct >= 0
+    color = GREEN if up else RED
+    img = f'<img class="wk-spark" src="{src}" alt="">' if src else ""
+
+    return (
+        f'<div class="wk-card {"up" if up else "dn"}">'
+        '<div class="wk-head">'
+        f'{CARD_NAME_HTML[it.symbol]}'
+        f'<div class="wk-pct" style="color:{color};">{pct:+.2f}%</div>'
+        '</div>'
+        f'<div class="wk-now">Now: {now:,.2f} &nbsp;&nbsp; Chg: {chg:+,.2f}</div>'
+        f'<div class="wk-foot">Date: {date_label} / Last: {last_ts} / {mode}</div>'
+        f'{img}'
+        '</div>'
+    )
 
-            pct = data["pct"]
-            chg = data["chg"]
-            now = data["now"]
-            mode = data["mode"]
-            date_label = data["date_label"]
-            last_ts = (
-                data["last_ts"].strftime("%m/%d %H:%M JST")
-                if mode == "INTRADAY"
-                else data["last_ts"].strftime("%Y-%m-%d")
-            )
+def render_market_row(items: Sequence[Item], cards: Dict[CardKey, Dict[str, Any]], srcs: Dict[str, str]):
+    """
+    - 1セクションのカード（チャート込み）を1つの st.markdown にまとめて送る
+    - カードごとに st.markdown / st.image を出すとその数だけ要素・メッセージが増える
+    """
+    body = "".join(card_html(it, cards[card_key(it)], srcs.get(it.symbol)) for it in items)
+    st.markdown(f'<div class="wk-grid">{body}</div>', unsafe_allow_html=True)
 
-            up = pct >= 0
-            color = GREEN if up else RED
-            bg = BG_UP if up else BG_DN
-
-            st.markdown(card_css(bg), unsafe_allow_html=True)
-            st.markdown(
-                f"""
-                <div class="wk-card">
-                  <div class="wk-head">
-                    <div class="wk-name">{it["name"]}<span class="wk-sym">{it["symbol"]}</span></div>
-                    <div class="wk-pct" style="color:{color};">{pct:+.2f}%</div>
-                  </div>
-                  <div class="wk-now">Now: {now:,.2f} &nbsp;&nbsp; Chg: {chg:+,.2f}</div>
-                  <div class="wk-foot">Date: {date_label} / Last: {last_ts} / {mode}</div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+@st.fragment(run_every=TTL_DAILY)
+def render_dashboard():
+    """
+    - カード一覧だけを fragment にする（更新ボタンはこの中だけを再実行）
+    - キャッシュの TTL ごとに一覧だけ自動で再実行する（ページ全体は再実行しない）
+    - サイドバー・GA 注入・タイトルはボタンで再実行しない
+    """
+    now_jst = datetime.now(JST)
 
-            fig = make_sparkline(data["series"], data["base"], data["mode"], up=up)
-            st.pyplot(fig, clear_figure=True)
+    head, action = st.columns([4, 1])
+    with action:
+        if st.button("キャッシュ削除して更新"):
+            st.cache_data.clear()
+            # cache_resource は全消ししない（yahoo_bucket / yahoo_breaker が作り直されると、
+            # レート制限中でもボタン1回で全銘柄を取りに行ってしまう）。データを持つものだけ消す
+            sparkline_slot.clear()
+            get_ticker.clear()
+            # 遮断中は取り直せないので、前回取れた値（ディスク）は残しておく
+            if yahoo_breaker().allow():
+                clear_disk_cache()
+            now_jst = datetime.now(JST)
+    head.caption(f"Run at (JST): {now_jst:%Y-%m-%d %H:%M:%S} / Font: {FONT_NAME}")
+
+    # 先に全カードをまとめて取得（逐次だと銘柄数ぶん待つ）
+    daily_map = fetch_daily_yahoo_batch(DAILY_SYMBOLS, days=CARD_DAILY_DAYS)
+    cards = compute_cards(ALL_ITEMS, daily_map)
+    srcs = render_sparklines(ALL_ITEMS, cards, light=st.session_state.get("light_charts", False))
+
+    for title, items in SECTIONS:
+        st.subheader(title)
+        render_market_row(items, cards, srcs)
+        st.divider()
 
 def main():
     st.set_page_config(page_title="Market Dashboard", layout="wide")
-    now_jst = datetime.now(JST)
 
     st.title("Market Dashboard")
-    st.caption(f"Run at (JST): {now_jst:%Y-%m-%d %H:%M:%S} / Font: {FONT_NAME}")
+    st.markdown(CARD_CSS, unsafe_allow_html=True)
 
     with st.sidebar:
         st.subheader("操作")
         st.write("レート制限回避のためキャッシュ長めです。")
-        if st.button("キャッシュ削除して更新"):
-            st.cache_data.clear()
-            st.rerun()
+        st.caption("「キャッシュ削除して更新」はカード一覧の右上にあります（一覧だけを再取得）。")
+        st.caption(f"カード一覧は {TTL_DAILY // 60} 分ごとに自動で更新されます。")
+        st.toggle("軽量チャート（SVG・軸なし）", key="light_charts")
+        if REPLAY_ONLY:
+            st.caption("MARKET_REPLAY_ONLY: 保存済みデータだけを表示しています（Yahoo/Tiingo には接続しません）。")
 
         st.subheader("Tiingo")
         key_exists = bool(get_tiingo_key())
         st.write(f"TIINGO_API_KEY: {'設定あり' if key_exists else '未設定'}")
         st.caption("Streamlit Cloud の Settings → Secrets に TIINGO_API_KEY を入れる想定です。")
 
-    for title, items in MARKETS.items():
-        st.subheader(title)
-        render_market_row(items, cols=4)
-        st.divider()
+    render_dashboard()
 
 main()